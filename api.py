@@ -8,7 +8,12 @@ from pinecone import Pinecone
 from dotenv import load_dotenv
 from src.RasoiGuru.components.check_index import IndexManager
 from src.RasoiGuru.components.data_ingestion import DataIngestor
+from src.RasoiGuru.components.doc_cache import DocumentCache
 from src.RasoiGuru.pipeline.pipeline import create_pipeline  
+from src.RasoiGuru.components.budget import LatencyBudget
+from src.RasoiGuru.components.namespace_router import NamespaceRouter
+from src import metrics
+from src.logger import setup_logging, set_request_context
 from langchain.chains.conversation.memory import ConversationBufferWindowMemory
 from src.utils import vector_exist, extract_answer, get_paths
 import yaml
@@ -26,6 +31,27 @@ index_name = pinecone_params.get("index_name", "default_index")
 cloud = pinecone_params.get("cloud", "aws")
 region = pinecone_params.get("region", "us-east-1")
 
+# Access ingestion parameters from the YAML file
+ingestion_params = params.get("ingestion", {})
+
+# Access retriever parameters from the YAML file
+retrieval_params = params.get("retrieval", {})
+
+# Access namespace routing parameters from the YAML file
+routing_params = dict(params.get("routing", {}))
+routing_enabled = routing_params.pop("enabled", False)
+
+# Access latency budget parameters from the YAML file
+latency_params = params.get("latency", {})
+
+# Access prefetch parameters from the YAML file
+prefetch_params = params.get("prefetch", {})
+prefetch_wait = prefetch_params.get("wait_seconds", 3)
+prefetch_routes = prefetch_params.get("routes", {})
+
+# Route logs through the background writer using the parameters from the YAML file
+setup_logging(**params.get("logging", {}))
+
 # Initialize FastAPI app
 app = FastAPI(
     title="RasoiGuru",
@@ -46,6 +72,12 @@ def welcome():
     return "Welcome to RasoiGuru"
 
 
+# Route to expose service counters
+@app.get("/metrics", summary="Metrics", tags=["Metrics"])
+def get_metrics():
+    return metrics.snapshot()
+
+
 # Function to get memory for session management
 def get_memory(session_id: str):
     if session_id not in memory_store:
@@ -53,13 +85,40 @@ def get_memory(session_id: str):
     return memory_store[session_id]
 
 
+# Namespace router shared by all requests of this process
+namespace_router = None
+
+
+# Function to get the namespace router, loading it on first use and rebuilding it if stale
+def get_router(pdf_files: list, namespaces: list, chunks: list) -> NamespaceRouter:
+    global namespace_router
+    if namespace_router is None:
+        namespace_router = NamespaceRouter(CohereEmbeddings(), **routing_params)
+        # A missing or unreadable index loads nothing and is rebuilt below
+        namespace_router.load()
+
+    # Hashes are reused while a file's size and modification time are unchanged
+    file_hashes = [DocumentCache.file_hash(path) for path in pdf_files]
+    if not namespace_router.is_current(namespaces, file_hashes):
+        if not chunks:
+            # The vectors were inserted earlier, so rebuild the routing index from the cached chunks
+            data_ingestor = DataIngestor(**ingestion_params)
+            chunks = data_ingestor.make_chunks(data_ingestor.load_documents(pdf_files))
+        namespace_router.build(namespaces, chunks, file_hashes)
+    return namespace_router
+
+
 # Route for chat functionality
 @app.post("/chat", summary="Chat with RasoiGuru", tags=["Chat"], response_model=Input)
 async def chat(input: Input, request: Request):
+    # Start the latency budget as soon as the request arrives
+    budget = LatencyBudget(**latency_params)
+
     # Generate a unique session ID for each user session
     session_id = request.cookies.get("session_id")
     if not session_id:
         session_id = str(uuid.uuid4())
+    set_request_context(str(uuid.uuid4()), session_id)
 
     memory = get_memory(session_id)
 
@@ -67,7 +126,7 @@ async def chat(input: Input, request: Request):
     index_manager = IndexManager(index_name=index_name, cloud=cloud, region=region)
     pc = Pinecone()
     if not vector_exist(index_manager.index_name, pc):
-        data_ingestor = DataIngestor()
+        data_ingestor = DataIngestor(**ingestion_params)
         pdf_files = get_paths()
         docs = data_ingestor.load_documents(pdf_files)
         chunks = data_ingestor.make_chunks(docs)
@@ -94,8 +153,17 @@ async def chat(input: Input, request: Request):
             )
             vectorstores.append(vectorstore)
 
+    # Load the namespace routing index once per process, and rebuild it when the PDFs change
+    router = None
+    namespaces = ["ns" + path.stem for path in pdf_files]
+    if routing_enabled:
+        router = get_router(pdf_files, namespaces, chunks)
+
     # Create pipeline (tools and executor)
-    executor = create_pipeline(vectorstores, memory)
+    # Prefetch the tool results up front if enabled for this route
+    wait_seconds = prefetch_wait if prefetch_routes.get(request.url.path, False) else None
+    executor = create_pipeline(vectorstores, memory, budget, query=input.query, prefetch_wait=wait_seconds,
+                               retrieval_params=retrieval_params, router=router, namespaces=namespaces)
 
     # Get response
     response = executor.invoke({"input": input.query})
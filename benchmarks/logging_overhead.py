@@ -0,0 +1,138 @@
+"""
+Measures the logging overhead on the request path of the old blocking
+FileHandler setup against the queue-based pipeline in src/logger.py.
+
+Each simulated request is timed on the calling thread, which is the time the
+caller waits for logging; formatting and writes done later by the listener
+thread are not counted. Requests are separated by a short sleep standing in
+for the LLM and tool calls, so the listener can drain the queue between them
+as it does in the API. Besides a plain file, the disk is made slow by an fsync
+after every record and by a fixed delay per write, which is where moving the
+I/O off the request path matters.
+
+Run from the project root:
+
+    python benchmarks/logging_overhead.py
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import src.logger as logger_module
+from src.logger import setup_logging, shutdown_logging, set_request_context
+from src.exception import CustomException
+
+# A /chat request logs roughly this many INFO lines across the components
+LINES_PER_REQUEST = 12
+# Time between requests spent waiting on the LLM and the tools, not timed
+THINK_SECONDS = 0.002
+# Write latency of the simulated slow disk
+SLOW_WRITE_SECONDS = 0.001
+
+
+class SyncedWrites:
+    """
+    Handler mixin that fsyncs the log file after every record.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        super().emit(record)
+        self.flush()
+        os.fsync(self.stream.fileno())
+
+
+class SlowWrites:
+    """
+    Handler mixin that adds a fixed latency to every write.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        time.sleep(SLOW_WRITE_SECONDS)
+        super().emit(record)
+
+
+# Disk behaviour and number of requests per case; slow disks get fewer requests to keep the run short
+DISKS = {
+    "local file": ((), 2000),
+    "fsync per record": ((SyncedWrites,), 300),
+    "1 ms per write": ((SlowWrites,), 150),
+}
+
+
+def simulate_request(i: int) -> None:
+    set_request_context(f"req-{i}", "bench-session")
+    for line in range(LINES_PER_REQUEST):
+        logging.info(f"Step {line} of request {i} done")
+    try:
+        try:
+            raise ValueError("tool failed")
+        except Exception as e:
+            raise CustomException(e, sys)
+    except CustomException:
+        pass
+
+
+def request_latencies_us(requests: int) -> np.ndarray:
+    latencies = []
+    for i in range(requests):
+        start = time.perf_counter()
+        simulate_request(i)
+        latencies.append(time.perf_counter() - start)
+        time.sleep(THINK_SECONDS)
+    return np.array(latencies) * 1e6
+
+
+def use_blocking_file_handler(log_file: str, handler_class: type) -> None:
+    # The previous src/logger.py configuration
+    shutdown_logging()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    handler = handler_class(log_file)
+    handler.setFormatter(logging.Formatter("[ %(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s"))
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+
+def use_queue(log_file: str, handler_class: type, **kwargs) -> None:
+    # setup_logging builds its file handler from the module's RotatingFileHandler
+    original = logger_module.RotatingFileHandler
+    logger_module.RotatingFileHandler = handler_class
+    try:
+        setup_logging(log_file=log_file, **kwargs)
+    finally:
+        logger_module.RotatingFileHandler = original
+
+
+if __name__ == "__main__":
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for disk, (mixins, requests) in DISKS.items():
+            blocking_class = type("BenchFileHandler", mixins + (logging.FileHandler,), {})
+            queue_class = type("BenchRotatingFileHandler", mixins + (logger_module.RotatingFileHandler,), {})
+            cases = {
+                "blocking FileHandler": lambda path: use_blocking_file_handler(path, blocking_class),
+                "queue + JSON": lambda path: use_queue(path, queue_class),
+                "queue + JSON, sampled 0.2": lambda path: use_queue(
+                    path, queue_class, sample_rates={"logging_overhead": 0.2}
+                ),
+            }
+            for name, configure in cases.items():
+                configure(os.path.join(tmp, f"{len(rows)}.log"))
+                latencies = request_latencies_us(requests)
+                # Drain the queue before the next case so the listener does not compete with it
+                shutdown_logging()
+                rows.append((disk, name, requests, latencies))
+
+    print(f"{LINES_PER_REQUEST} INFO lines + 1 CustomException per request, time on the calling thread")
+    print(f"{'disk':<18} {'handler':<26} {'requests':>8} {'mean_us':>9} {'p50_us':>9} {'p99_us':>9}")
+    for disk, name, requests, latencies in rows:
+        print(f"{disk:<18} {name:<26} {requests:>8} {latencies.mean():>9.1f} "
+              f"{np.percentile(latencies, 50):>9.1f} {np.percentile(latencies, 99):>9.1f}")
@@ -0,0 +1,78 @@
+"""
+Sweeps chunk size, chunk overlap, k and retriever mode over a labeled question
+set and reports recall@k, MRR, index size, chunking and embedding time,
+retrieval latency and context tokens per query. The PDF is parsed once without
+the parsed-document cache and its parse time is reported on its own.
+
+Runs offline with hashed local embeddings by default. With --embeddings cohere
+the Cohere embeddings are cached on disk, so only the first run calls the API
+for the documents and later runs time cache reads. Run from the project root:
+
+    python benchmarks/retrieval_sweep.py --output artifacts/retrieval_sweep.json
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.RasoiGuru.components.retrieval_eval import HashingEmbeddings, RetrievalEvaluator
+
+
+def load_embeddings(name: str, cache_dir: Path):
+    if name == "hashing":
+        return HashingEmbeddings()
+
+    from dotenv import load_dotenv
+    from langchain.embeddings import CacheBackedEmbeddings
+    from langchain.storage import LocalFileStore
+    from langchain_cohere import CohereEmbeddings
+
+    load_dotenv()
+    underlying = CohereEmbeddings()
+    return CacheBackedEmbeddings.from_bytes_store(
+        underlying, LocalFileStore(str(cache_dir / "embeddings")), namespace=underlying.model
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", default="benchmarks/bhm401t_questions.json", help="Labeled question set")
+    parser.add_argument("--pdf", default="data/BHM-401T.pdf", help="PDF the questions are about")
+    parser.add_argument("--embeddings", choices=["hashing", "cohere"], default="hashing")
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    with open("params.yaml", "r") as f:
+        params = yaml.safe_load(f)
+    grid = params.get("evaluation", {})
+
+    with open(args.questions, "r") as f:
+        questions = json.load(f)
+
+    evaluator = RetrievalEvaluator([Path(args.pdf)], questions, load_embeddings(args.embeddings, Path("artifacts")))
+    results = evaluator.sweep(
+        grid.get("chunk_sizes", [1000]),
+        grid.get("chunk_overlaps", [20]),
+        grid.get("ks", [4]),
+        grid.get("search_types", ["similarity"]),
+    )
+
+    header = f"{'size':>5} {'overlap':>7} {'k':>3} {'mode':<10} {'recall@k':>8} {'mrr':>6} {'chunks':>6} " \
+             f"{'index_kb':>8} {'chunk_s':>7} {'embed_s':>7} {'lat_ms':>7} {'p95_ms':>7} {'ctx_tok':>7}  frontier"
+    print(f"{len(questions)} questions, {args.embeddings} embeddings, parsed in {evaluator.parse_seconds:.2f}s")
+    print(header)
+    for r in sorted(results, key=lambda r: (-r["recall_at_k"], r["context_tokens_mean"])):
+        print(f"{r['chunk_size']:>5} {r['chunk_overlap']:>7} {r['k']:>3} {r['search_type']:<10} "
+              f"{r['recall_at_k']:>8.3f} {r['mrr']:>6.3f} {r['num_chunks']:>6} {r['index_bytes'] / 1024:>8.0f} "
+              f"{r['chunk_seconds']:>7.2f} {r['embed_seconds']:>7.2f} {r['latency_ms_mean']:>7.2f} {r['latency_ms_p95']:>7.2f} "
+              f"{r['context_tokens_mean']:>7.0f}  {'*' if r['frontier'] else ''}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
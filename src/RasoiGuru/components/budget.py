@@ -0,0 +1,291 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+import requests
+import urllib3
+from src.logger import logging
+from src import metrics
+
+# Upper bound on tool calls running at once across all requests, including abandoned ones
+MAX_RUNNING_CALLS = 32
+_running_calls = threading.BoundedSemaphore(MAX_RUNNING_CALLS)
+
+# Timeout of the tool call running in the current context, read by the Pinecone and Wikipedia clients
+_call_timeout = contextvars.ContextVar("call_timeout", default=None)
+
+
+class ToolBacklogFull(Exception):
+    """
+    Raised when too many tool calls are still running to start another one.
+    """
+
+
+def current_timeout() -> Optional[float]:
+    """
+    Returns the timeout of the tool call running in the current context, or None outside one.
+    """
+    return _call_timeout.get()
+
+
+def start_call(func: Callable, timeout: float, *args: Any, **kwargs: Any) -> Future:
+    """
+    Starts a blocking call on its own daemon thread with `timeout` visible through `current_timeout`.
+
+    Each call gets a fresh thread, so calls left running by other requests never
+    delay it; the total number of running calls is capped by MAX_RUNNING_CALLS.
+
+    Args:
+        func (Callable): The function to call.
+        timeout (float): Timeout passed down to the clients used by the call.
+
+    Returns:
+        Future: The future of the call.
+
+    Raises:
+        ToolBacklogFull: If MAX_RUNNING_CALLS calls are still running.
+    """
+    if not _running_calls.acquire(blocking=False):
+        metrics.increment("tool_backlog_full_total")
+        raise ToolBacklogFull(f"{MAX_RUNNING_CALLS} tool calls are still running")
+
+    future = Future()
+    future.set_running_or_notify_cancel()
+
+    def run() -> None:
+        try:
+            _call_timeout.set(timeout)
+            future.set_result(func(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            _running_calls.release()
+
+    # Run in a copy of the caller's context so log records keep the request IDs
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(run,), daemon=True).start()
+    return future
+
+
+class DeadlineIndex:
+    """
+    Proxy of a Pinecone Index that passes the current call timeout to every query.
+    """
+
+    def __init__(self, index: Any):
+        self._index = index
+
+    def query(self, *args: Any, **kwargs: Any) -> Any:
+        timeout = current_timeout()
+        if timeout is not None:
+            kwargs.setdefault("_request_timeout", timeout)
+        return self._index.query(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._index, name)
+
+
+def apply_index_timeout(vectorstore: Any) -> None:
+    """
+    Makes a PineconeVectorStore send the current call timeout with its queries.
+
+    Args:
+        vectorstore: The vector store; stores without a Pinecone index are left unchanged.
+    """
+    index = getattr(vectorstore, "_index", None)
+    if index is not None and not isinstance(index, DeadlineIndex):
+        vectorstore._index = DeadlineIndex(index)
+
+
+def _is_timeout(error: Exception) -> bool:
+    if isinstance(error, urllib3.exceptions.MaxRetryError):
+        error = error.reason
+    return isinstance(error, (requests.Timeout, urllib3.exceptions.TimeoutError))
+
+
+class _DeadlineRequests:
+    """
+    Stand-in for the `requests` module that adds the current call timeout to GET requests.
+    """
+
+    def get(self, *args: Any, **kwargs: Any) -> requests.Response:
+        kwargs.setdefault("timeout", current_timeout())
+        return requests.get(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(requests, name)
+
+
+def apply_wikipedia_timeout() -> None:
+    """
+    Makes the `wikipedia` package send the current call timeout with its HTTP requests.
+
+    The package calls `requests.get` without a timeout and has no option for one.
+    """
+    import wikipedia.wikipedia as wikipedia_module
+
+    if not isinstance(wikipedia_module.requests, _DeadlineRequests):
+        wikipedia_module.requests = _DeadlineRequests()
+
+
+# Observation returned instead of running a tool once the tool-call cap is reached
+TOOL_LIMIT_MESSAGE = "Tool call limit reached. Give your Final Answer using the information you already have."
+
+
+class BudgetExhausted(Exception):
+    """
+    Raised when a request runs out of time or tool calls.
+    """
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(f"Latency budget exhausted: {reason}")
+        self.reason = reason
+
+
+class LatencyBudget:
+    """
+    Per-request deadline and tool-call allowance shared by the LLM, the tools and the agent executor.
+    """
+
+    def __init__(self, budget_seconds: float = 30.0, max_iterations: int = 5,
+                 max_tool_calls: int = 4, llm_max_retries: int = 1, verbose: bool = False):
+        """
+        Initializes the LatencyBudget and starts its clock.
+
+        Args:
+            budget_seconds (float, optional): Overall latency budget for the request. Defaults to 30.0.
+            max_iterations (int, optional): Maximum agent iterations. Defaults to 5.
+            max_tool_calls (int, optional): Maximum tool calls across the request. Defaults to 4.
+            llm_max_retries (int, optional): Retries allowed per LLM call; all attempts share the remaining time. Defaults to 1.
+            verbose (bool, optional): Whether the agent executor prints every step. Defaults to False.
+        """
+        self.budget_seconds = budget_seconds
+        self.max_iterations = max_iterations
+        self.max_tool_calls = max_tool_calls
+        self.llm_max_retries = llm_max_retries
+        self.verbose = verbose
+        self.deadline = time.monotonic() + budget_seconds
+        self.tool_calls = 0
+        self.observations = []
+        self.stop_reason = None
+
+    def remaining(self) -> float:
+        """
+        Returns the number of seconds left before the deadline, never negative.
+        """
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self) -> bool:
+        """
+        Returns True once the deadline has passed.
+        """
+        return self.remaining() <= 0.0
+
+    def timeout(self) -> float:
+        """
+        Returns the remaining time to use as a call timeout.
+
+        Raises:
+            BudgetExhausted: If the deadline has already passed.
+        """
+        remaining = self.remaining()
+        if remaining <= 0.0:
+            raise BudgetExhausted(self.stop("deadline"))
+        return remaining
+
+    def stop(self, reason: str) -> str:
+        """
+        Records why the request stopped early and counts it in the metrics.
+
+        Only the first reason is kept, so a single request is counted once.
+
+        Args:
+            reason (str): Why the budget ran out (e.g. "deadline", "tool_calls", "iterations").
+
+        Returns:
+            str: The recorded stop reason.
+        """
+        if self.stop_reason is None:
+            self.stop_reason = reason
+            metrics.increment("budget_exhausted_total")
+            metrics.increment(f"budget_exhausted_{reason}")
+            logging.warning(f"Latency budget exhausted: {reason}")
+        return self.stop_reason
+
+    def should_stop(self) -> bool:
+        """
+        Returns True if the agent should not start another iteration.
+        """
+        # The tool-call cap only refuses new calls in `call`, so the agent can still answer
+        if self.expired():
+            self.stop("deadline")
+        return self.stop_reason is not None
+
+    def call(self, name: str, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """
+        Runs a blocking tool call bounded by the remaining time.
+
+        The remaining time is passed to the Pinecone and Wikipedia clients as their
+        request timeout. Once the tool-call cap is reached, the call is refused and
+        the agent is told to answer with what it has.
+
+        Args:
+            name (str): Name of the tool, used for logging.
+            func (Callable): The tool function.
+
+        Returns:
+            Any: The tool result.
+
+        Raises:
+            BudgetExhausted: If the deadline is reached or too many tool calls are still running.
+        """
+        if self.max_tool_calls is not None and self.tool_calls >= self.max_tool_calls:
+            metrics.increment("budget_tool_calls_refused_total")
+            logging.info(f"Tool {name} refused after {self.tool_calls} tool calls")
+            return TOOL_LIMIT_MESSAGE
+        timeout = self.timeout()
+        self.tool_calls += 1
+
+        try:
+            future = start_call(func, timeout, *args, **kwargs)
+        except ToolBacklogFull:
+            logging.warning(f"Tool {name} not started, too many tool calls still running")
+            raise BudgetExhausted(self.stop("tool_backlog"))
+        try:
+            result = future.result(timeout=timeout)
+        except Exception as e:
+            # The clients time out on their own just before the future does
+            if not (isinstance(e, FutureTimeoutError) or _is_timeout(e)):
+                raise
+            logging.warning(f"Tool {name} timed out after {timeout:.2f}s")
+            raise BudgetExhausted(self.stop("deadline"))
+
+        self.observations.append((name, str(result)))
+        return result
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """
+        Returns a version of a tool function that runs through `call`.
+        """
+        def wrapped(*args: Any, **kwargs: Any) -> Any:
+            return self.call(name, func, *args, **kwargs)
+        return wrapped
+
+    def partial_answer(self, max_chars: int = 1500) -> str:
+        """
+        Builds the best available answer from what the tools returned so far.
+
+        Args:
+            max_chars (int, optional): Maximum length of the included context. Defaults to 1500.
+
+        Returns:
+            str: A final answer built from the latest non-empty observation.
+        """
+        for name, observation in reversed(self.observations):
+            if observation.strip():
+                return (
+                    "Final Answer: I had to stop before finishing, but here is what I found "
+                    f"using {name}:\n{observation.strip()[:max_chars]}"
+                )
+        return "Final Answer: Sorry, I could not find an answer in time. Please try asking again."
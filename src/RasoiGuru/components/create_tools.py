@@ -4,6 +4,9 @@ from langchain.agents import Tool
 from langchain.tools.retriever import create_retriever_tool
 from src.logger import logging
 from src.exception import CustomException
+from src.RasoiGuru.components.budget import LatencyBudget, apply_index_timeout, apply_wikipedia_timeout
+from src.RasoiGuru.components.namespace_router import NamespaceRouter, RoutedRetriever
+from typing import Optional
 import sys
 
 class ToolCreator:
@@ -11,12 +14,14 @@ class ToolCreator:
     Class to create search tools.
     """
 
-    def create_retriever(self, vectorstores: list) -> list:
+    def create_retriever(self, vectorstores: list, search_type: str = "similarity", search_kwargs: Optional[dict] = None) -> list:
         """
         Creates retrievers from vectorstores.
 
         Args:
             vectorstores (list): List of PineconeVectorStore objects.
+            search_type (str, optional): Retriever mode, e.g. "similarity" or "mmr". Defaults to "similarity".
+            search_kwargs (dict, optional): Search arguments such as {"k": 4}. Defaults to None.
 
         Returns:
             list: List of retriever objects.
@@ -27,7 +32,8 @@ class ToolCreator:
         try:
             retrievers = []
             for vectorstore in vectorstores:
-                retriever = vectorstore.as_retriever()
+                apply_index_timeout(vectorstore)
+                retriever = vectorstore.as_retriever(search_type=search_type, search_kwargs=search_kwargs or {})
                 retrievers.append(retriever)
             logging.info("Retrievers created successfully")
             return retrievers
@@ -35,6 +41,44 @@ class ToolCreator:
             logging.error("Error creating retrievers")
             raise CustomException(e, sys)
 
+    def create_routed_retriever(self, vectorstores: list, namespaces: list, router: NamespaceRouter,
+                                search_type: str = "similarity", search_kwargs: Optional[dict] = None) -> list:
+        """
+        Creates a single retriever that searches only the namespaces chosen by the router.
+
+        Args:
+            vectorstores (list): List of PineconeVectorStore objects.
+            namespaces (list): Namespace of each vectorstore.
+            router (NamespaceRouter): The namespace router.
+            search_type (str, optional): Retriever mode, "similarity" or "mmr". Defaults to "similarity".
+            search_kwargs (dict, optional): Search arguments such as {"k": 4}. Defaults to None.
+
+        Returns:
+            list: List holding the routed retriever.
+
+        Raises:
+            CustomException: If the search type is not supported or an error occurs while creating the retriever.
+        """
+        try:
+            if search_type not in RoutedRetriever.allowed_search_types:
+                raise ValueError(
+                    f"search_type {search_type!r} is not supported with namespace routing, "
+                    f"use one of {RoutedRetriever.allowed_search_types}"
+                )
+            for vectorstore in vectorstores:
+                apply_index_timeout(vectorstore)
+            retriever = RoutedRetriever(
+                vectorstores=dict(zip(namespaces, vectorstores)),
+                router=router,
+                search_type=search_type,
+                search_kwargs=search_kwargs or {}
+            )
+            logging.info(f"Routed retriever created successfully with search type {search_type}")
+            return [retriever]
+        except Exception as e:
+            logging.error("Error creating routed retriever")
+            raise CustomException(e, sys)
+
     def create_wiki(self) -> Tool:
         """
         Creates the Wikipedia search tool.
@@ -46,6 +90,7 @@ class ToolCreator:
             CustomException: If an error occurs while creating the Wikipedia tool.
         """
         try:
+            apply_wikipedia_timeout()
             wiki_tool = WikipediaQueryRun(
                 api_wrapper=WikipediaAPIWrapper(
                     top_k_results=1,
@@ -96,4 +141,34 @@ class ToolCreator:
             return tools
         except Exception as e:
             logging.error("Error creating tools")
+            raise CustomException(e, sys)
+
+    def apply_budget(self, tools: list, budget: LatencyBudget) -> list:
+        """
+        Bounds every tool call by the remaining request time and the tool-call cap.
+
+        Args:
+            tools (list): List of search tools.
+            budget (LatencyBudget): Latency budget of the current request.
+
+        Returns:
+            list: List of budgeted search tools.
+
+        Raises:
+            CustomException: If an error occurs while wrapping the tools.
+        """
+        try:
+            budgeted_tools = []
+            for tool in tools:
+                budgeted_tool = Tool(
+                    name=tool.name,
+                    description=tool.description,
+                    func=budget.wrap(tool.name, tool.func),
+                    args_schema=tool.args_schema
+                )
+                budgeted_tools.append(budgeted_tool)
+            logging.info("Latency budget applied to tools")
+            return budgeted_tools
+        except Exception as e:
+            logging.error("Error applying latency budget to tools")
             raise CustomException(e, sys)
\ No newline at end of file
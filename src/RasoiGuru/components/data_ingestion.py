@@ -3,6 +3,9 @@ from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from src.logger import logging
 from src.exception import CustomException
+from src.RasoiGuru.components.doc_cache import DocumentCache
+from src import metrics
+from typing import Optional
 import sys
 
 class DataIngestor:
@@ -10,10 +13,32 @@ class DataIngestor:
     Class to load and process documents.
     """
 
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 20, cache_dir: Optional[Path] = None):
+        """
+        Initializes the DataIngestor.
+
+        Args:
+            chunk_size (int, optional): Maximum size of a chunk in characters. Defaults to 1000.
+            chunk_overlap (int, optional): Overlap between consecutive chunks. Defaults to 20.
+            cache_dir (Path, optional): Directory of the parsed-document cache; caching is off if None. Defaults to None.
+        """
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        splitter_params = {
+            "splitter": RecursiveCharacterTextSplitter.__name__,
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+        }
+        self.cache = DocumentCache(cache_dir, splitter_params) if cache_dir is not None else None
+        # Cache key and cached chunks (or None) of each loaded file, by source path
+        self._entries = {}
+
     def load_documents(self, pdf_files: list) -> list:
         """
         Loads documents from PDF files.
 
+        Files found in the cache are read from it instead of being parsed.
+
         Args:
             pdf_files (list): List of PDF file paths.
 
@@ -26,6 +51,18 @@ class DataIngestor:
         try:
             docs = []
             for filepath in pdf_files:
+                if self.cache is not None:
+                    key = self.cache.key(filepath)
+                    cached = self.cache.load(key, filepath)
+                    if cached is not None:
+                        pages, chunks = cached
+                        self._entries[str(filepath)] = (key, chunks)
+                        docs.append(pages)
+                        metrics.increment("doc_cache_hits_total")
+                        continue
+                    self._entries[str(filepath)] = (key, None)
+                    metrics.increment("doc_cache_misses_total")
+
                 loader = PyPDFLoader(filepath)
                 docs.append(loader.load())
             logging.info("Loaded the PDF documents")
@@ -38,6 +75,8 @@ class DataIngestor:
         """
         Splits documents into chunks.
 
+        Chunks of cached files are reused; newly split files are written to the cache.
+
         Args:
             docs (list): List of loaded documents.
 
@@ -49,10 +88,18 @@ class DataIngestor:
         """
         try:
             documents = []
-            text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=20)
+            text_splitter = RecursiveCharacterTextSplitter(chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap)
             for doc in docs:
+                source = doc[0].metadata.get("source") if doc else None
+                key, cached_chunks = self._entries.get(source, (None, None))
+                if cached_chunks is not None:
+                    documents.append(cached_chunks)
+                    continue
+
                 splitted_docs = text_splitter.split_documents(doc)
                 documents.append(splitted_docs)
+                if key is not None:
+                    self.cache.save(key, doc, splitted_docs)
             logging.info("Chunks created")
 
             contents = []
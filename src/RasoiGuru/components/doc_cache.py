@@ -0,0 +1,183 @@
+import hashlib
+import json
+import mmap
+import os
+from importlib.metadata import version, PackageNotFoundError
+from pathlib import Path
+from typing import Optional
+from langchain_core.documents import Document
+from src.logger import logging
+from src.exception import CustomException
+from src import metrics
+import sys
+
+# Bump when the on-disk layout changes so old entries are ignored
+CACHE_FORMAT_VERSION = 1
+
+# Size, modification time and content hash of each hashed file, by path
+_file_hashes = {}
+
+
+def _pypdf_version() -> str:
+    try:
+        return version("pypdf")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+class DocumentCache:
+    """
+    Class to store parsed pages and chunks on disk, keyed by PDF content and chunking config.
+
+    Each entry is a pair of files: `<key>.bin` holds every page and chunk text
+    back to back as UTF-8, and `<key>.json` holds their offsets and metadata.
+    The text file is memory-mapped on load, so nothing is parsed again.
+    """
+
+    def __init__(self, cache_dir: Path, splitter_params: dict):
+        """
+        Initializes the DocumentCache.
+
+        Args:
+            cache_dir (Path): Directory holding the cache entries.
+            splitter_params (dict): Text splitter settings that the chunks depend on.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.splitter_params = splitter_params
+        self.pypdf_version = _pypdf_version()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def file_hash(filepath: Path) -> str:
+        """
+        Computes the SHA-256 hash of a file's content.
+
+        The hash is kept per path and only computed again once the file's size or
+        modification time changes, so checking an unchanged corpus costs one stat per file.
+
+        Args:
+            filepath (Path): Path of the file.
+
+        Returns:
+            str: The hex digest of the content.
+        """
+        stat = os.stat(filepath)
+        cached = _file_hashes.get(str(filepath))
+        if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            return cached[2]
+
+        file_hash = hashlib.sha256()
+        with open(filepath, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                file_hash.update(block)
+        _file_hashes[str(filepath)] = (stat.st_size, stat.st_mtime_ns, file_hash.hexdigest())
+        return file_hash.hexdigest()
+
+    def key(self, filepath: Path) -> str:
+        """
+        Computes the cache key of a PDF from its content hash, the pypdf version and the splitter settings.
+
+        Args:
+            filepath (Path): Path of the PDF file.
+
+        Returns:
+            str: The cache key.
+        """
+        config = json.dumps(
+            {
+                "format": CACHE_FORMAT_VERSION,
+                "pypdf": self.pypdf_version,
+                "splitter": self.splitter_params,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256((self.file_hash(filepath) + config).encode("utf-8")).hexdigest()
+
+    def load(self, key: str, filepath: Path) -> Optional[tuple]:
+        """
+        Loads the pages and chunks of a cache entry.
+
+        Args:
+            key (str): The cache key.
+            filepath (Path): Path of the PDF file, used as the source of the loaded documents.
+
+        Returns:
+            Optional[tuple]: The (pages, chunks) lists of Documents, or None if the entry
+                does not exist or cannot be read.
+        """
+        index_path = self.cache_dir / f"{key}.json"
+        if not index_path.exists():
+            return None
+
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+
+            data_path = self.cache_dir / f"{key}.bin"
+            with open(data_path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    data = b""
+                else:
+                    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    pages = [self._read(data, entry, filepath) for entry in index["pages"]]
+                    chunks = [self._read(data, entry, filepath) for entry in index["chunks"]]
+                finally:
+                    if isinstance(data, mmap.mmap):
+                        data.close()
+
+            return pages, chunks
+
+        except Exception as e:
+            # A damaged entry is treated as a miss, so the PDF is parsed again and the entry rewritten
+            metrics.increment("doc_cache_errors_total")
+            logging.warning(f"Ignoring unreadable cache entry {key}: {e}")
+            return None
+
+    def save(self, key: str, pages: list, chunks: list) -> None:
+        """
+        Writes the pages and chunks of a PDF as a cache entry.
+
+        Args:
+            key (str): The cache key.
+            pages (list): List of page Documents.
+            chunks (list): List of chunk Documents.
+
+        Raises:
+            CustomException: If an error occurs while writing the entry.
+        """
+        try:
+            index = {"pages": [], "chunks": []}
+            data_path = self.cache_dir / f"{key}.bin"
+            index_path = self.cache_dir / f"{key}.json"
+
+            offset = 0
+            with open(f"{data_path}.tmp", "wb") as f:
+                for section, documents in (("pages", pages), ("chunks", chunks)):
+                    for document in documents:
+                        text = document.page_content.encode("utf-8")
+                        f.write(text)
+                        index[section].append(
+                            {"offset": offset, "length": len(text), "metadata": document.metadata}
+                        )
+                        offset += len(text)
+
+            with open(f"{index_path}.tmp", "w", encoding="utf-8") as f:
+                json.dump(index, f)
+
+            # The index is moved last, so an entry only exists once both files are complete
+            os.replace(f"{data_path}.tmp", data_path)
+            os.replace(f"{index_path}.tmp", index_path)
+
+        except Exception as e:
+            logging.error("Error saving documents to the cache")
+            raise CustomException(e, sys)
+
+    @staticmethod
+    def _read(data, entry: dict, filepath: Path) -> Document:
+        raw = data[entry["offset"]:entry["offset"] + entry["length"]]
+        if len(raw) != entry["length"]:
+            raise ValueError("text file is truncated")
+        text = raw.decode("utf-8")
+        metadata = dict(entry["metadata"], source=str(filepath))
+        return Document(page_content=text, metadata=metadata)
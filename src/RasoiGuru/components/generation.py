@@ -1,31 +1,107 @@
 from langchain_groq import ChatGroq
 from langchain.agents import AgentExecutor, create_tool_calling_agent
+from langchain_core.agents import AgentFinish
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
 from langchain_core.prompts import PromptTemplate
 from langchain.chains.conversation.memory import ConversationBufferWindowMemory
 from src.logger import logging
 from src.exception import CustomException
+from src.RasoiGuru.components.budget import BudgetExhausted, LatencyBudget
+from typing import Any, Dict, List, Optional
+import groq
 import sys
 
+# Errors worth another attempt; the others would fail the same way again
+RETRYABLE_ERRORS = (groq.APITimeoutError, groq.APIConnectionError, groq.RateLimitError, groq.InternalServerError)
+
+
+class BudgetedChatGroq(ChatGroq):
+    """
+    ChatGroq whose calls, retries included, fit in the remaining request time.
+
+    The Groq client is created without retries, since it would give every attempt
+    the full timeout. Retries happen here instead, and each attempt gets an equal
+    share of the time left.
+    """
+
+    budget: Any = None
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        if self.budget is None:
+            return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+        attempts = self.budget.llm_max_retries + 1
+        for attempt in range(attempts):
+            timeout = self.budget.timeout() / (attempts - attempt)
+            try:
+                return super()._generate(messages, stop=stop, run_manager=run_manager, timeout=timeout, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                if attempt == attempts - 1:
+                    raise
+                logging.warning(f"LLM call failed after {timeout:.2f}s, retrying: {e}")
+
+
+class BudgetedAgentExecutor(AgentExecutor):
+    """
+    AgentExecutor that stops early when the latency budget runs out and returns the best partial answer.
+    """
+
+    budget: Any = None
+
+    def _should_continue(self, iterations: int, time_elapsed: float) -> bool:
+        if not super()._should_continue(iterations, time_elapsed):
+            if self.budget is not None:
+                self.budget.stop("iterations")
+            return False
+        return self.budget is None or not self.budget.should_stop()
+
+    def _return(self, output: AgentFinish, intermediate_steps: list, run_manager=None) -> Dict[str, Any]:
+        if self.budget is not None and self.budget.stop_reason is not None:
+            output = AgentFinish({"output": self.budget.partial_answer()}, log=self.budget.stop_reason)
+        return super()._return(output, intermediate_steps, run_manager=run_manager)
+
+    def _call(self, inputs: Dict[str, str], run_manager=None) -> Dict[str, Any]:
+        try:
+            return super()._call(inputs, run_manager=run_manager)
+        except Exception as e:
+            # LLM timeouts surface as client errors, so anything raised after the deadline counts as exhaustion
+            if self.budget is None or not (isinstance(e, BudgetExhausted) or self.budget.expired()):
+                raise
+            self.budget.stop(e.reason if isinstance(e, BudgetExhausted) else "deadline")
+            return self._return(AgentFinish({}, log=""), [], run_manager=run_manager)
+
+
 class Generator:
     """
     Class to handle user interactions and generate responses.
     """
 
-    def __init__(self):
+    def __init__(self, budget: Optional[LatencyBudget] = None):
         """
         Initializes the Generator.
+
+        Args:
+            budget (LatencyBudget, optional): Latency budget of the current request. Defaults to None.
         """
         # load_dotenv()
         # os.environ["GROQ_API_KEY"] = os.getenv("GROQ_API_KEY")
         # print(f"API Key: {os.getenv('GROQ_API_KEY')}")
-        self.llm = ChatGroq(model="mixtral-8x7b-32768")
+        self.budget = budget
+        if budget is not None:
+            self.llm = BudgetedChatGroq(model="mixtral-8x7b-32768", budget=budget, max_retries=0)
+        else:
+            self.llm = ChatGroq(model="mixtral-8x7b-32768")
 
-    def create_prompt(self, tools: list) -> PromptTemplate:
+    def create_prompt(self, tools: list, prefetched_context: str = "") -> PromptTemplate:
         """
         Creates the prompt template for the language model.
 
         Args:
             tools (list): List of available search tools.
+            prefetched_context (str, optional): Tool results already retrieved for the query. Defaults to "".
 
         Returns:
             PromptTemplate: The prompt template for the language model.
@@ -64,6 +140,7 @@ class Generator:
             """
 
             suffix = """Begin! Now answer the question
+            {prefetched_context}
             {intermediate_steps}
             Chat history:
             {chat_history}
@@ -79,6 +156,14 @@ class Generator:
                 template= prefix + format + suffix
             )
 
+            if prefetched_context:
+                prefetched_context = (
+                    "Observations already retrieved for this question. "
+                    "Answer from them directly if they are enough, otherwise use the tools:\n"
+                    + prefetched_context
+                )
+            prompt = prompt.partial(prefetched_context=prefetched_context)
+
             logging.info("Prompt created successfully")
 
             return prompt
@@ -106,7 +191,17 @@ class Generator:
             agent = create_tool_calling_agent(self.llm, tools=tools, prompt=prompt)
             logging.info("Agent created successfully")
 
-            agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True, memory=memory)
+            if self.budget is not None:
+                agent_executor = BudgetedAgentExecutor(
+                    agent=agent,
+                    tools=tools,
+                    verbose=self.budget.verbose,
+                    memory=memory,
+                    max_iterations=self.budget.max_iterations,
+                    budget=self.budget
+                )
+            else:
+                agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True, memory=memory)
             logging.info("Agent executor created successfully")
             return agent_executor
         except Exception as e:
@@ -0,0 +1,259 @@
+import json
+import math
+import os
+import re
+from collections import Counter
+from itertools import zip_longest
+from pathlib import Path
+from typing import Any, ClassVar, Dict, List
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from src.logger import logging
+from src.exception import CustomException
+from src import metrics
+import sys
+
+# Words too common in cooking text to tell namespaces apart
+STOP_WORDS = {
+    "the", "and", "for", "are", "with", "that", "this", "from", "which", "used", "also", "can", "have",
+    "has", "was", "were", "its", "into", "all", "other", "such", "been", "they", "their", "not", "but",
+    "food", "foods", "what", "how", "who", "why", "when", "where", "does", "use", "uses",
+}
+
+
+def _terms(text: str) -> List[str]:
+    return [word for word in re.findall(r"[a-z]{3,}", text.lower()) if word not in STOP_WORDS]
+
+
+class NamespaceRouter:
+    """
+    Class to pick the namespaces worth searching for a query.
+
+    At ingestion time each namespace gets a centroid of a sample of its chunk
+    embeddings and a keyword signature of its most distinctive terms. At query
+    time namespaces are ranked by centroid similarity plus keyword overlap and
+    only the top ones are searched.
+    """
+
+    def __init__(self, embedding_model: Embeddings, index_path: Path = Path("artifacts/namespace_router.npz"),
+                 top_n: int = 3, min_score: float = 0.2, keyword_weight: float = 0.5,
+                 num_keywords: int = 30, sample_chunks: int = 16):
+        """
+        Initializes the NamespaceRouter.
+
+        Args:
+            embedding_model (Embeddings): Embedding model used for the centroids and queries.
+            index_path (Path, optional): File holding the routing index. Defaults to "artifacts/namespace_router.npz".
+            top_n (int, optional): Number of namespaces searched per query. Defaults to 3.
+            min_score (float, optional): Best score below which all namespaces are searched. Defaults to 0.2.
+            keyword_weight (float, optional): Weight of the keyword overlap in the score. Defaults to 0.5.
+            num_keywords (int, optional): Size of each keyword signature. Defaults to 30.
+            sample_chunks (int, optional): Chunks embedded per namespace for its centroid. Defaults to 16.
+        """
+        self.embedding_model = embedding_model
+        self.index_path = Path(index_path)
+        self.top_n = top_n
+        self.min_score = min_score
+        self.keyword_weight = keyword_weight
+        self.num_keywords = num_keywords
+        self.sample_chunks = sample_chunks
+        self.namespaces = []
+        self.centroids = np.zeros((0, 0), dtype=np.float32)
+        self.keywords = []
+        self.file_hashes = []
+
+    def exists(self) -> bool:
+        """
+        Returns True if a routing index has been saved.
+        """
+        return self.index_path.exists()
+
+    def build(self, namespaces: list, contents: list, file_hashes: list = None) -> None:
+        """
+        Builds and saves the routing index from the chunks of each namespace.
+
+        Args:
+            namespaces (list): List of namespace names.
+            contents (list): List of chunk texts for each namespace.
+            file_hashes (list, optional): Content hash of the file behind each namespace,
+                saved so a changed file can be detected. Defaults to None.
+
+        Raises:
+            CustomException: If an error occurs while building the index.
+        """
+        try:
+            centroids = []
+            for content in contents:
+                # Evenly spaced chunks keep the embedding cost per namespace fixed
+                step = max(1, math.ceil(len(content) / self.sample_chunks))
+                sample = content[::step][:self.sample_chunks]
+                vectors = np.array(self.embedding_model.embed_documents(sample), dtype=np.float32)
+                centroid = vectors.mean(axis=0) if len(vectors) else np.zeros(0, dtype=np.float32)
+                centroids.append(centroid)
+
+            dimension = max((len(c) for c in centroids), default=0)
+            self.centroids = np.array(
+                [c / (np.linalg.norm(c) or 1.0) if len(c) else np.zeros(dimension) for c in centroids],
+                dtype=np.float32
+            ).reshape(len(centroids), dimension)
+
+            term_counts = [Counter(term for text in content for term in _terms(text)) for content in contents]
+            document_frequency = Counter(term for counts in term_counts for term in counts)
+            self.keywords = []
+            for counts in term_counts:
+                scored = {
+                    term: (1 + math.log(count)) * math.log(1 + len(contents) / document_frequency[term])
+                    for term, count in counts.items()
+                }
+                self.keywords.append(sorted(scored, key=scored.get, reverse=True)[:self.num_keywords])
+
+            self.namespaces = list(namespaces)
+            self.file_hashes = list(file_hashes or [])
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            # Moved into place once complete, so a crash or another worker never leaves a half-written index
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f,
+                    centroids=self.centroids,
+                    meta=np.array(json.dumps(
+                        {"namespaces": self.namespaces, "keywords": self.keywords, "file_hashes": self.file_hashes}
+                    ))
+                )
+            os.replace(tmp_path, self.index_path)
+            logging.info(f"Routing index built for {len(self.namespaces)} namespaces")
+
+        except Exception as e:
+            logging.error("Error building the routing index")
+            raise CustomException(e, sys)
+
+    def load(self) -> bool:
+        """
+        Loads the saved routing index.
+
+        Returns:
+            bool: True if the index was loaded, False if it is missing or unreadable and must be rebuilt.
+        """
+        if not self.exists():
+            return False
+
+        try:
+            with np.load(self.index_path) as data:
+                centroids = data["centroids"]
+                meta = json.loads(str(data["meta"]))
+            self.centroids = centroids
+            self.namespaces = meta["namespaces"]
+            self.keywords = meta["keywords"]
+            self.file_hashes = meta.get("file_hashes", [])
+            logging.info(f"Routing index loaded for {len(self.namespaces)} namespaces")
+            return True
+        except Exception as e:
+            # A damaged index is treated as stale, so it is rebuilt instead of failing every request
+            metrics.increment("router_index_errors_total")
+            logging.warning(f"Ignoring unreadable routing index {self.index_path}: {e}")
+            return False
+
+    def is_current(self, namespaces: list, file_hashes: list) -> bool:
+        """
+        Returns True if the index was built for these namespaces from files with these content hashes.
+
+        Args:
+            namespaces (list): List of namespace names.
+            file_hashes (list): Content hash of the file behind each namespace.
+        """
+        return self.namespaces == list(namespaces) and self.file_hashes == list(file_hashes)
+
+    def route(self, query: str, query_embedding: List[float] = None) -> List[str]:
+        """
+        Returns the namespaces to search for a query.
+
+        Args:
+            query (str): The user query.
+            query_embedding (List[float], optional): Embedding of the query, computed if not given.
+
+        Returns:
+            List[str]: The top namespaces, or all of them when routing is not confident.
+        """
+        metrics.increment("router_queries_total")
+        if len(self.namespaces) <= self.top_n:
+            return list(self.namespaces)
+
+        if query_embedding is None:
+            query_embedding = self.embedding_model.embed_query(query)
+        query_vector = np.array(query_embedding, dtype=np.float32)
+        query_vector /= np.linalg.norm(query_vector) or 1.0
+        scores = self.centroids @ query_vector
+
+        query_terms = set(_terms(query))
+        if query_terms:
+            overlap = [len(query_terms.intersection(keywords)) / len(query_terms) for keywords in self.keywords]
+            scores = scores + self.keyword_weight * np.array(overlap, dtype=np.float32)
+
+        if scores.max() < self.min_score:
+            metrics.increment("router_fallbacks_total")
+            logging.info(f"Routing confidence {scores.max():.2f} too low, searching all namespaces")
+            return list(self.namespaces)
+
+        selected = [self.namespaces[i] for i in np.argsort(-scores)[:self.top_n]]
+        pruned = len(self.namespaces) - len(selected)
+        metrics.increment("router_namespaces_pruned_total", pruned)
+        logging.info(f"Routed query to {len(selected)} namespaces, pruned {pruned}")
+        return selected
+
+
+class RoutedRetriever(BaseRetriever):
+    """
+    Retriever that searches only the namespaces chosen by a NamespaceRouter and merges the results.
+
+    With "similarity" the results are merged by score. With "mmr" each namespace
+    runs its own MMR search and the results are interleaved in routing order,
+    since MMR results carry no comparable score.
+    """
+
+    vectorstores: Dict[str, Any]
+    router: Any
+    search_type: str = "similarity"
+    search_kwargs: Dict[str, Any] = {}
+    allowed_search_types: ClassVar[tuple] = ("similarity", "mmr")
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        # Embed the query once for routing and for every namespace search
+        query_embedding = self.router.embedding_model.embed_query(query)
+        namespaces = [ns for ns in self.router.route(query, query_embedding) if ns in self.vectorstores]
+        if not namespaces:
+            namespaces = list(self.vectorstores)
+
+        search_kwargs = dict(self.search_kwargs)
+        k = search_kwargs.pop("k", 4)
+        if self.search_type == "mmr":
+            return self._mmr(query, query_embedding, namespaces, k, search_kwargs)
+
+        results = []
+        for namespace in namespaces:
+            vectorstore = self.vectorstores[namespace]
+            if hasattr(vectorstore, "similarity_search_by_vector_with_score"):
+                results.extend(vectorstore.similarity_search_by_vector_with_score(query_embedding, k=k, **search_kwargs))
+            else:
+                results.extend(vectorstore.similarity_search_with_score(query, k=k, **search_kwargs))
+
+        results.sort(key=lambda result: result[1], reverse=True)
+        return [doc for doc, _ in results[:k]]
+
+    def _mmr(self, query: str, query_embedding: List[float], namespaces: List[str], k: int,
+             search_kwargs: Dict[str, Any]) -> List[Document]:
+        per_namespace = []
+        for namespace in namespaces:
+            vectorstore = self.vectorstores[namespace]
+            try:
+                docs = vectorstore.max_marginal_relevance_search_by_vector(query_embedding, k=k, **search_kwargs)
+            except NotImplementedError:
+                # The base VectorStore defines the by-vector search but not every store implements it
+                docs = vectorstore.max_marginal_relevance_search(query, k=k, **search_kwargs)
+            per_namespace.append(docs)
+
+        # Round robin over the namespaces keeps the best result of each before the second of any
+        merged = [doc for rank in zip_longest(*per_namespace) for doc in rank if doc is not None]
+        return merged[:k]
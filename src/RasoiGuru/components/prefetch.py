@@ -0,0 +1,134 @@
+import threading
+import time
+from concurrent.futures import wait
+from typing import Any, Callable, Optional
+from langchain.agents import Tool
+from src.logger import logging
+from src.exception import CustomException
+from src.RasoiGuru.components.budget import LatencyBudget, ToolBacklogFull, start_call
+from src import metrics
+import sys
+
+class Prefetcher:
+    """
+    Class to run the search tools in parallel as soon as a query arrives.
+    """
+
+    def __init__(self, wait_seconds: float = 3.0, budget: Optional[LatencyBudget] = None):
+        """
+        Initializes the Prefetcher.
+
+        Args:
+            wait_seconds (float, optional): How long to wait for the tools before ignoring them. Defaults to 3.0.
+            budget (LatencyBudget, optional): Latency budget of the current request; the wait never exceeds it. Defaults to None.
+        """
+        self.wait_seconds = wait_seconds
+        self.budget = budget
+        self.results = {}
+        self.live_calls = 0
+        self._lock = threading.Lock()
+
+    def fetch(self, query: str, tools: list) -> str:
+        """
+        Calls every tool with the query at the same time and collects the results that arrive in time.
+
+        The wait is passed to the tools as their request timeout, so late calls end on their own.
+
+        Args:
+            query (str): The user query.
+            tools (list): List of search tools.
+
+        Returns:
+            str: The prefetched results formatted as observations, or an empty string.
+
+        Raises:
+            CustomException: If an error occurs while prefetching.
+        """
+        try:
+            metrics.increment("prefetch_requests_total")
+            timeout = self.wait_seconds
+            if self.budget is not None:
+                timeout = min(timeout, self.budget.remaining())
+
+            start = time.monotonic()
+            futures = {}
+            for tool in tools:
+                try:
+                    futures[start_call(tool.func, timeout, query)] = tool.name
+                except ToolBacklogFull:
+                    metrics.increment("prefetch_errors_total")
+                    logging.warning(f"Prefetch of {tool.name} skipped, too many tool calls still running")
+            done, not_done = wait(futures, timeout=timeout)
+
+            observations = []
+            for future, name in futures.items():
+                if future in not_done:
+                    metrics.increment("prefetch_late_total")
+                    logging.info(f"Prefetch of {name} ignored after {timeout:.2f}s")
+                elif future.exception() is not None:
+                    metrics.increment("prefetch_errors_total")
+                    logging.warning(f"Prefetch of {name} failed: {future.exception()}")
+                else:
+                    result = str(future.result())
+                    self.results[(name, self._normalize(query))] = result
+                    observations.append(f"Observation from {name}:\n{result}")
+                    if self.budget is not None:
+                        # Let an early stop fall back to the prefetched results
+                        self.budget.observations.append((name, result))
+                    metrics.increment("prefetch_results_total")
+
+            logging.info(f"Prefetched {len(observations)} of {len(tools)} tools in {time.monotonic() - start:.2f}s")
+            return "\n\n".join(observations)
+
+        except Exception as e:
+            logging.error("Error prefetching tool results")
+            raise CustomException(e, sys)
+
+    def wrap_tools(self, tools: list) -> list:
+        """
+        Serves repeated tool calls from the prefetched results and counts the live ones.
+
+        Args:
+            tools (list): List of search tools.
+
+        Returns:
+            list: List of tools that reuse prefetched results.
+
+        Raises:
+            CustomException: If an error occurs while wrapping the tools.
+        """
+        try:
+            wrapped_tools = []
+            for tool in tools:
+                wrapped_tool = Tool(
+                    name=tool.name,
+                    description=tool.description,
+                    func=self._wrap(tool.name, tool.func),
+                    args_schema=tool.args_schema
+                )
+                wrapped_tools.append(wrapped_tool)
+            return wrapped_tools
+        except Exception as e:
+            logging.error("Error wrapping tools for prefetch")
+            raise CustomException(e, sys)
+
+    def _wrap(self, name: str, func: Callable) -> Callable:
+        def wrapped(query: Any) -> Any:
+            key = (name, self._normalize(query))
+            if key in self.results:
+                metrics.increment("prefetch_cache_hits_total")
+                return self.results[key]
+
+            with self._lock:
+                self.live_calls += 1
+                first_call = self.live_calls == 1
+            if first_call:
+                # The prefetched context was not enough to answer without tools
+                metrics.increment("prefetch_requests_needing_tools_total")
+            metrics.increment("prefetch_live_tool_calls_total")
+            return func(query)
+        return wrapped
+
+    @staticmethod
+    def _normalize(query: Any) -> str:
+        return " ".join(str(query).lower().split())
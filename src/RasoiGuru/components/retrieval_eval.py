@@ -0,0 +1,354 @@
+import hashlib
+import itertools
+import re
+import time
+from typing import Any, Iterable, List, Optional
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from langchain_community.vectorstores.utils import maximal_marginal_relevance
+from src.RasoiGuru.components.create_tools import ToolCreator
+from src.RasoiGuru.components.data_ingestion import DataIngestor
+from src.logger import logging
+from src.exception import CustomException
+import sys
+
+# Rough size of a token in characters, used to estimate prompt cost without a tokenizer
+CHARS_PER_TOKEN = 4
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Local lexical stand-in for the Cohere embeddings.
+
+    Words are hashed into a fixed number of buckets with sublinear term
+    frequency and the vector is L2-normalized, so it needs no network and
+    always gives the same vectors for the same text.
+    """
+
+    def __init__(self, dimension: int = 2048):
+        """
+        Initializes the HashingEmbeddings.
+
+        Args:
+            dimension (int, optional): Number of hash buckets. Defaults to 2048.
+        """
+        self.dimension = dimension
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for word in re.findall(r"[a-z0-9]+", text.lower()):
+            bucket = int.from_bytes(hashlib.md5(word.encode("utf-8")).digest()[:4], "little") % self.dimension
+            vector[bucket] += 1.0
+        nonzero = vector > 0
+        vector[nonzero] = 1.0 + np.log(vector[nonzero])
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-memory vector store with cosine similarity and MMR search, used in place of Pinecone offline.
+    """
+
+    def __init__(self, embedding: Embeddings):
+        """
+        Initializes the LocalVectorStore.
+
+        Args:
+            embedding (Embeddings): The embedding model.
+        """
+        self.embedding = embedding
+        self.documents = []
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns the size of the stored vectors and texts in bytes.
+        """
+        return self.vectors.nbytes + sum(len(doc.page_content.encode("utf-8")) for doc in self.documents)
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None, **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        vectors = np.array(self.embedding.embed_documents(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+
+        start = len(self.documents)
+        self.documents.extend(Document(page_content=text, metadata=metadata) for text, metadata in zip(texts, metadatas))
+        self.vectors = vectors if start == 0 else np.vstack([self.vectors, vectors])
+        return [str(i) for i in range(start, len(self.documents))]
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   **kwargs: Any) -> "LocalVectorStore":
+        store = cls(embedding)
+        store.add_texts(texts, metadatas)
+        return store
+
+    def _scores(self, embedding: List[float]) -> np.ndarray:
+        query = np.array(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        return self.vectors @ (query / norm if norm > 0 else query)
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[tuple]:
+        if not self.documents:
+            return []
+        scores = self._scores(self.embedding.embed_query(query))
+        top = np.argsort(-scores)[:k]
+        return [(self.documents[i], float(scores[i])) for i in top]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k)]
+
+    def _select_relevance_score_fn(self):
+        return lambda score: score
+
+    def max_marginal_relevance_search(self, query: str, k: int = 4, fetch_k: int = 20,
+                                      lambda_mult: float = 0.5, **kwargs: Any) -> List[Document]:
+        if not self.documents:
+            return []
+        query_embedding = np.array(self.embedding.embed_query(query), dtype=np.float32)
+        candidates = np.argsort(-self._scores(query_embedding))[:fetch_k]
+        selected = maximal_marginal_relevance(query_embedding, self.vectors[candidates], lambda_mult=lambda_mult, k=k)
+        return [self.documents[candidates[i]] for i in selected]
+
+
+class RetrievalEvaluator:
+    """
+    Class to score retrieval settings against a labeled question set.
+
+    Each question lists evidence phrases taken from the PDF. Every chunk keeps
+    the character span it covers on its page, and a phrase counts as found once
+    the retrieved chunks together cover one of its occurrences, so a phrase
+    split across two adjacent chunks is found when both are retrieved.
+    """
+
+    def __init__(self, pdf_files: list, questions: list, embeddings: Embeddings):
+        """
+        Initializes the RetrievalEvaluator.
+
+        Args:
+            pdf_files (list): List of PDF file paths.
+            questions (list): List of {"question": str, "evidence": [str, ...]} dicts.
+            embeddings (Embeddings): Embedding model used to build the indexes.
+        """
+        self.pdf_files = pdf_files
+        self.questions = questions
+        self.embeddings = embeddings
+        self.pages = None
+        self.parse_seconds = None
+        self._evidence_spans = {}
+        self._indexes = {}
+
+    def load_pages(self) -> list:
+        """
+        Parses the PDFs once, without the parsed-document cache, so the parse time does not depend on cache state.
+
+        Returns:
+            list: List of page Documents for each PDF.
+        """
+        if self.pages is None:
+            start = time.perf_counter()
+            self.pages = DataIngestor().load_documents(self.pdf_files)
+            self.parse_seconds = time.perf_counter() - start
+        return self.pages
+
+    def _locate(self, docs: list, contents: list) -> list:
+        # The splitter keeps chunks in page order, so each one is searched for from the end of the last
+        spans = []
+        for pages, chunks in zip(docs, contents):
+            page_number, cursor = 0, 0
+            for chunk in chunks:
+                position = pages[page_number].page_content.find(chunk, cursor)
+                while position == -1 and page_number + 1 < len(pages):
+                    page_number, cursor = page_number + 1, 0
+                    position = pages[page_number].page_content.find(chunk)
+                if position == -1:
+                    raise ValueError("chunk not found in its document")
+                # Chunks are stripped, so the whitespace after one is counted in its span to close the gap
+                text = pages[page_number].page_content
+                end = position + len(chunk)
+                while end < len(text) and text[end].isspace():
+                    end += 1
+                spans.append((id(pages[page_number]), position, end))
+                cursor = position + 1
+        return spans
+
+    def _evidence(self, phrase: str) -> list:
+        # Occurrences of a phrase on every page, allowing any whitespace between its words
+        if phrase not in self._evidence_spans:
+            pattern = re.compile(r"\s+".join(re.escape(word) for word in phrase.split()), re.IGNORECASE)
+            self._evidence_spans[phrase] = [
+                (id(page), match.start(), match.end())
+                for pages in self.load_pages() for page in pages
+                for match in pattern.finditer(page.page_content)
+            ]
+        return self._evidence_spans[phrase]
+
+    @staticmethod
+    def _covered(occurrence: tuple, spans: list) -> bool:
+        page, start, end = occurrence
+        for span_page, span_start, span_end in sorted(spans):
+            if span_page == page and span_start <= start < span_end:
+                start = span_end
+            if start >= end:
+                return True
+        return False
+
+    def build_index(self, chunk_size: int, chunk_overlap: int) -> dict:
+        """
+        Chunks and embeds the corpus once per chunking setting.
+
+        Args:
+            chunk_size (int): Maximum size of a chunk in characters.
+            chunk_overlap (int): Overlap between consecutive chunks.
+
+        Returns:
+            dict: The vector store, chunk spans, chunking and embedding times, number of chunks and index size in bytes.
+
+        Raises:
+            CustomException: If an error occurs while building the index.
+        """
+        key = (chunk_size, chunk_overlap)
+        if key in self._indexes:
+            return self._indexes[key]
+
+        try:
+            docs = self.load_pages()
+
+            start = time.perf_counter()
+            contents = DataIngestor(chunk_size=chunk_size, chunk_overlap=chunk_overlap).make_chunks(docs)
+            chunk_seconds = time.perf_counter() - start
+
+            texts = [text for content in contents for text in content]
+            start = time.perf_counter()
+            vectorstore = LocalVectorStore.from_texts(
+                texts, self.embeddings, metadatas=[{"chunk": i} for i in range(len(texts))]
+            )
+            embed_seconds = time.perf_counter() - start
+
+            self._indexes[key] = {
+                "vectorstore": vectorstore,
+                "spans": self._locate(docs, contents),
+                "chunk_seconds": chunk_seconds,
+                "embed_seconds": embed_seconds,
+                "num_chunks": len(texts),
+                "index_bytes": vectorstore.nbytes,
+            }
+            logging.info(f"Built evaluation index for chunk_size={chunk_size} chunk_overlap={chunk_overlap}")
+            return self._indexes[key]
+
+        except Exception as e:
+            logging.error("Error building evaluation index")
+            raise CustomException(e, sys)
+
+    def evaluate(self, chunk_size: int, chunk_overlap: int, k: int, search_type: str) -> dict:
+        """
+        Scores one retrieval setting over the question set.
+
+        Args:
+            chunk_size (int): Maximum size of a chunk in characters.
+            chunk_overlap (int): Overlap between consecutive chunks.
+            k (int): Number of chunks retrieved per query.
+            search_type (str): Retriever mode, e.g. "similarity" or "mmr".
+
+        Returns:
+            dict: The setting with recall@k, MRR, index size, parse, chunking and embedding times,
+                retrieval latency and context tokens.
+
+        Raises:
+            CustomException: If an error occurs during evaluation.
+        """
+        try:
+            index = self.build_index(chunk_size, chunk_overlap)
+            retriever = ToolCreator().create_retriever(
+                [index["vectorstore"]], search_type=search_type, search_kwargs={"k": k}
+            )[0]
+
+            recalls, reciprocal_ranks, latencies, tokens = [], [], [], []
+            for item in self.questions:
+                start = time.perf_counter()
+                docs = retriever.invoke(item["question"])
+                latencies.append(time.perf_counter() - start)
+
+                spans = [index["spans"][doc.metadata["chunk"]] for doc in docs]
+                ranks = [
+                    next(
+                        (rank for rank in range(1, len(spans) + 1)
+                         if any(self._covered(occurrence, spans[:rank]) for occurrence in self._evidence(phrase))),
+                        None
+                    )
+                    for phrase in item["evidence"]
+                ]
+                found = [rank for rank in ranks if rank is not None]
+                recalls.append(len(found) / len(item["evidence"]))
+                reciprocal_ranks.append(1.0 / min(found) if found else 0.0)
+                tokens.append(sum(len(doc.page_content) for doc in docs) / CHARS_PER_TOKEN)
+
+            return {
+                "chunk_size": chunk_size,
+                "chunk_overlap": chunk_overlap,
+                "k": k,
+                "search_type": search_type,
+                "recall_at_k": float(np.mean(recalls)),
+                "mrr": float(np.mean(reciprocal_ranks)),
+                "num_chunks": index["num_chunks"],
+                "index_bytes": index["index_bytes"],
+                "parse_seconds": self.parse_seconds,
+                "chunk_seconds": index["chunk_seconds"],
+                "embed_seconds": index["embed_seconds"],
+                "latency_ms_mean": float(np.mean(latencies) * 1000),
+                "latency_ms_p95": float(np.percentile(latencies, 95) * 1000),
+                "context_tokens_mean": float(np.mean(tokens)),
+            }
+
+        except Exception as e:
+            logging.error("Error evaluating retrieval setting")
+            raise CustomException(e, sys)
+
+    def sweep(self, chunk_sizes: list, chunk_overlaps: list, ks: list, search_types: list) -> list:
+        """
+        Evaluates every combination of the given settings and marks the quality/cost frontier.
+
+        A result is on the frontier if no other result has at least the same
+        recall@k and MRR with fewer context tokens per query.
+
+        Args:
+            chunk_sizes (list): Chunk sizes to try.
+            chunk_overlaps (list): Chunk overlaps to try; overlaps not smaller than the chunk size are skipped.
+            ks (list): Numbers of retrieved chunks to try.
+            search_types (list): Retriever modes to try.
+
+        Returns:
+            list: List of result dicts, each with a "frontier" flag.
+        """
+        results = []
+        for chunk_size, chunk_overlap, k, search_type in itertools.product(chunk_sizes, chunk_overlaps, ks, search_types):
+            if chunk_overlap >= chunk_size:
+                continue
+            results.append(self.evaluate(chunk_size, chunk_overlap, k, search_type))
+
+        for result in results:
+            result["frontier"] = not any(
+                other["recall_at_k"] >= result["recall_at_k"]
+                and other["mrr"] >= result["mrr"]
+                and other["context_tokens_mean"] < result["context_tokens_mean"]
+                for other in results
+            )
+        return results
@@ -1,26 +1,61 @@
-from typing import List
+from typing import List, Optional
 from src.RasoiGuru.components.create_tools import ToolCreator
 from src.RasoiGuru.components.generation import Generator
 from langchain.chains.conversation.memory import ConversationBufferWindowMemory
 from langchain.agents import AgentExecutor
+from src.RasoiGuru.components.budget import LatencyBudget
+from src.RasoiGuru.components.prefetch import Prefetcher
+from src.RasoiGuru.components.namespace_router import NamespaceRouter
+from src import metrics
 
-def create_pipeline(vectorstores: List, memory: ConversationBufferWindowMemory) -> AgentExecutor:
+def create_pipeline(vectorstores: List, memory: ConversationBufferWindowMemory, budget: Optional[LatencyBudget] = None,
+                    query: Optional[str] = None, prefetch_wait: Optional[float] = None,
+                    retrieval_params: Optional[dict] = None, router: Optional[NamespaceRouter] = None,
+                    namespaces: Optional[List[str]] = None) -> AgentExecutor:
     """
     Creates a pipeline for generating responses.
 
     Args:
         vectorstores: A list of PineconeVectorStore objects.
+        budget: Optional latency budget bounding the LLM calls, tool calls and agent iterations.
+        query: The user query, required for prefetching.
+        prefetch_wait: If set, the tools are called in parallel with the query up front and
+            results arriving within this many seconds are put in the prompt. Skipped for
+            follow-up questions, since the raw query does not carry the chat history.
+        retrieval_params: Optional retriever settings, e.g. {"search_type": "mmr", "search_kwargs": {"k": 4}}.
+        router: Optional namespace router; if set, one retriever searches only the routed namespaces.
+        namespaces: The namespace of each vectorstore, required with a router.
 
     Returns:
         A tuple containing the created tools and the agent executor.
     """
     tool_creator = ToolCreator()
-    retrievers = tool_creator.create_retriever(vectorstores) if vectorstores else []
+    retrieval_params = retrieval_params or {}
+    if not vectorstores:
+        retrievers = []
+    elif router is not None:
+        retrievers = tool_creator.create_routed_retriever(vectorstores, namespaces, router, **retrieval_params)
+    else:
+        retrievers = tool_creator.create_retriever(vectorstores, **retrieval_params)
     wiki_tool = tool_creator.create_wiki()
     tools = tool_creator.make_tools(wiki_tool, retrievers)
 
-    generator = Generator()
-    prompt = generator.create_prompt(tools)
+    prefetcher = None
+    prefetched_context = ""
+    if query is not None and prefetch_wait is not None and memory.chat_memory.messages:
+        # A follow-up like "what about its history?" would prefetch unrelated context
+        metrics.increment("prefetch_skipped_followups_total")
+    elif query is not None and prefetch_wait is not None:
+        prefetcher = Prefetcher(prefetch_wait, budget)
+        prefetched_context = prefetcher.fetch(query, tools)
+
+    if budget is not None:
+        tools = tool_creator.apply_budget(tools, budget)
+    if prefetcher is not None:
+        tools = prefetcher.wrap_tools(tools)
+
+    generator = Generator(budget)
+    prompt = generator.create_prompt(tools, prefetched_context)
     executor = generator.create_agent(prompt, memory, tools)
 
     return executor
\ No newline at end of file
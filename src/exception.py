@@ -13,6 +13,22 @@ def error_message_detail(error: Exception, error_detail: sys) -> str:
         str: A formatted string containing the filename, line number, and error message.
     """
     _, _, exc_tb = error_detail.exc_info()
+    return format_error_message(error, exc_tb)
+
+
+def format_error_message(error: Exception, exc_tb) -> str:
+    """
+    Formats the detailed error message from a traceback object.
+
+    Args:
+        error (Exception): The exception instance.
+        exc_tb: The traceback of the exception being handled, or None.
+
+    Returns:
+        str: A formatted string containing the filename, line number, and error message.
+    """
+    if exc_tb is None:
+        return f"Error occurred error message [{str(error)}]"
     file_name = exc_tb.tb_frame.f_code.co_filename
     error_message = (
         f"Error occurred in Python script name [{file_name}] "
@@ -24,6 +40,9 @@ class CustomException(Exception):
     """
     Custom exception class that provides detailed error messages.
 
+    Only the traceback is captured when the exception is raised; the message is
+    formatted the first time it is read, so raising stays cheap on the request path.
+
     Attributes:
         error_message (str): Detailed error message.
     """
@@ -37,7 +56,20 @@ class CustomException(Exception):
             error_detail (sys): The sys module, used to extract exception information.
         """
         super().__init__(error_message)
-        self.error_message = error_message_detail(error_message, error_detail=error_detail)
+        self._exc_tb = error_detail.exc_info()[2]
+        self._error_message = None
+
+    @property
+    def error_message(self) -> str:
+        """
+        Returns the detailed error message, formatting it on first access.
+
+        Returns:
+            str: The detailed error message.
+        """
+        if self._error_message is None:
+            self._error_message = format_error_message(self.args[0], self._exc_tb)
+        return self._error_message
 
     def __str__(self) -> str:
         """
@@ -47,8 +79,3 @@ class CustomException(Exception):
             str: The detailed error message.
         """
         return self.error_message
-
-
-
-
-        
\ No newline at end of file
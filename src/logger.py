@@ -1,20 +1,163 @@
+import atexit
+import contextvars
+import json
 import logging
 import os
-from datetime import datetime
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-# Define the log file name with the current timestamp
-LOG_FILE = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
+# Define the path to the logs directory
+LOG_DIR = os.path.join(os.getcwd(), "logs")
 
-# Define the path to the logs directory and create it if it doesn't exist
-logs_path = os.path.join(os.getcwd(), "logs", LOG_FILE)
-os.makedirs(logs_path, exist_ok=True)
+# Define the full path to the log file, rotated by size instead of per process start
+LOG_FILE_PATH = os.path.join(LOG_DIR, "rasoiguru.log")
 
-# Define the full path to the log file
-LOG_FILE_PATH = os.path.join(logs_path, LOG_FILE)
+# Request and session IDs of the request currently being served
+request_id_var = contextvars.ContextVar("request_id", default=None)
+session_id_var = contextvars.ContextVar("session_id", default=None)
 
-# Configure basic logging settings
-logging.basicConfig(
-    filename=LOG_FILE_PATH,  # Set the log file path
-    format="[ %(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s",  # Set the log message format
-    level=logging.INFO,  # Set the logging level to INFO
-)
\ No newline at end of file
+# Background listener that owns the file handler
+_listener = None
+
+
+def set_request_context(request_id: str, session_id: str) -> None:
+    """Attaches request and session IDs to every log record of the current request.
+
+    Args:
+        request_id: The unique ID of the request.
+        session_id: The ID of the user session.
+    """
+    request_id_var.set(request_id)
+    session_id_var.set(session_id)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Stamps records with the request and session IDs.
+
+    Runs on the calling thread, before the record is queued, so the IDs are
+    read from the right context.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.session_id = session_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of the low-level records from the sampled hot-path modules.
+
+    Records from other modules or loggers, and records above the sampled level,
+    are always kept.
+    """
+
+    def __init__(self, sample_rates: dict, sample_level: str = "INFO") -> None:
+        """
+        Initializes the SamplingFilter.
+
+        Args:
+            sample_rates (dict): Mapping of module or logger name (e.g. "create_tools") to the fraction of records to keep.
+            sample_level (str, optional): Highest level that is sampled. Defaults to "INFO".
+        """
+        super().__init__()
+        self.sample_rates = dict(sample_rates)
+        self.sample_level = logging.getLevelName(sample_level.upper())
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.sample_level:
+            return True
+        rate = self.sample_rates.get(record.module, self.sample_rates.get(record.name, 1.0))
+        return rate >= 1.0 or random.random() < rate
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves formatting, including tracebacks, to the writer thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge the arguments so they cannot change while the record waits in the queue
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "lineno": record.lineno,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "session_id": getattr(record, "session_id", None),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(log_file: str = LOG_FILE_PATH, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5,
+                  level: str = "INFO", sample_rates: dict = None, sample_level: str = "INFO") -> None:
+    """Routes the root logger through a queue to a background writer thread.
+
+    Callers only pay for putting the record on the queue; formatting and disk
+    I/O happen on the listener thread. Calling it again replaces the previous
+    configuration.
+
+    Args:
+        log_file: Path of the log file.
+        max_bytes: Size at which the log file is rotated.
+        backup_count: Number of rotated files to keep.
+        level: Minimum level to log.
+        sample_rates: Mapping of hot-path module or logger name to the fraction of its records to keep,
+            e.g. {"create_tools": 0.1}. Unlisted modules and loggers are not sampled.
+        sample_level: Highest level that is sampled.
+    """
+    global _listener
+
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = BackgroundQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_rates or {}, sample_level))
+    queue_handler.addFilter(ContextFilter())
+
+    shutdown_logging()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, file_handler)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flushes queued records and stops the background writer thread."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+# Configure logging with the defaults; the API reconfigures it from params.yaml
+setup_logging()
+atexit.register(shutdown_logging)
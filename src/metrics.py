@@ -0,0 +1,27 @@
+import threading
+from collections import Counter
+
+# Process-wide counters, guarded by a lock since tools may run on worker threads
+_counters = Counter()
+_lock = threading.Lock()
+
+
+def increment(name: str, value: int = 1) -> None:
+    """Increments the named counter.
+
+    Args:
+        name: The name of the counter.
+        value (int, optional): Amount to add. Defaults to 1.
+    """
+    with _lock:
+        _counters[name] += value
+
+
+def snapshot() -> dict:
+    """Returns a copy of all counters.
+
+    Returns:
+        A dictionary mapping counter names to their current values.
+    """
+    with _lock:
+        return dict(_counters)
@@ -80,7 +80,7 @@ def get_paths(data_dir: Path = Path("data")) -> list[Path]:
 
     This function takes an optional `data_dir` argument specifying the directory
     containing the PDF files. It iterates through the files in the directory and
-    returns a list of paths to all files with the `.pdf` extension.
+    returns a sorted list of paths to all files with the `.pdf` extension.
 
     Args:
         data_dir (Path, optional): The directory containing the PDF files.
@@ -109,7 +109,8 @@ def get_paths(data_dir: Path = Path("data")) -> list[Path]:
                 pdf_files.append(file)
 
         logging.info("Got the PDF file paths")
-        return pdf_files
+        # Sorted so the namespaces and vector stores built from the paths keep the same order
+        return sorted(pdf_files)
 
     except Exception as e:
         logging.info("Error occurred while getting the PDF file paths")
@@ -0,0 +1,39 @@
+import threading
+import time
+from src.RasoiGuru.components.budget import (
+    LatencyBudget, BudgetExhausted, TOOL_LIMIT_MESSAGE, current_timeout, start_call
+)
+import pytest
+
+
+def test_tool_call_cap_refuses_calls_without_stopping_the_agent():
+    budget = LatencyBudget(budget_seconds=10, max_tool_calls=1)
+    assert budget.call("pdf", lambda q: "paneer", "q") == "paneer"
+    assert budget.call("pdf", lambda q: "paneer", "q") == TOOL_LIMIT_MESSAGE
+    assert not budget.should_stop()
+    assert budget.stop_reason is None
+
+
+def test_call_passes_the_remaining_time_to_the_tool():
+    budget = LatencyBudget(budget_seconds=5)
+    timeout = budget.call("pdf", current_timeout)
+    assert 4 < timeout <= 5
+    assert current_timeout() is None
+
+
+def test_call_past_the_deadline_raises():
+    budget = LatencyBudget(budget_seconds=0.2)
+    with pytest.raises(BudgetExhausted):
+        budget.call("wiki", time.sleep, 1)
+    assert budget.stop_reason == "deadline"
+
+
+def test_hung_calls_do_not_delay_new_calls():
+    release = threading.Event()
+    for _ in range(8):
+        start_call(release.wait, 1.0)
+    try:
+        budget = LatencyBudget(budget_seconds=1)
+        assert budget.call("pdf", lambda: "ok") == "ok"
+    finally:
+        release.set()
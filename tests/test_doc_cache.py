@@ -0,0 +1,62 @@
+import os
+from langchain_core.documents import Document
+from src.RasoiGuru.components.doc_cache import DocumentCache
+
+SPLITTER = {"splitter": "RecursiveCharacterTextSplitter", "chunk_size": 1000, "chunk_overlap": 20}
+
+
+def make_entry(tmp_path):
+    pdf = tmp_path / "recipes.pdf"
+    pdf.write_bytes(b"%PDF- paneer")
+    pages = [Document(page_content="Paneer is fresh cheese.", metadata={"source": "old.pdf", "page": 0}),
+             Document(page_content="Ghee is clarified butter ₹", metadata={"source": "old.pdf", "page": 1})]
+    chunks = [Document(page_content="Paneer is fresh", metadata={"source": "old.pdf", "page": 0})]
+    cache = DocumentCache(tmp_path / "cache", SPLITTER)
+    key = cache.key(pdf)
+    cache.save(key, pages, chunks)
+    return cache, pdf, key, pages, chunks
+
+
+def test_round_trip(tmp_path):
+    cache, pdf, key, pages, chunks = make_entry(tmp_path)
+    loaded_pages, loaded_chunks = cache.load(key, pdf)
+    assert [p.page_content for p in loaded_pages] == [p.page_content for p in pages]
+    assert [c.page_content for c in loaded_chunks] == [c.page_content for c in chunks]
+    assert loaded_pages[1].metadata == {"source": str(pdf), "page": 1}
+
+
+def test_key_changes_with_file_content_and_splitter(tmp_path):
+    cache, pdf, key, _, _ = make_entry(tmp_path)
+    assert DocumentCache(tmp_path / "cache", dict(SPLITTER, chunk_size=500)).key(pdf) != key
+    pdf.write_bytes(b"%PDF- ghee")
+    assert cache.key(pdf) != key
+    assert cache.load(cache.key(pdf), pdf) is None
+
+
+def test_damaged_entry_is_a_miss(tmp_path):
+    cache, pdf, key, _, _ = make_entry(tmp_path)
+    (tmp_path / "cache" / f"{key}.bin").unlink()
+    assert cache.load(key, pdf) is None
+
+    cache, pdf, key, _, _ = make_entry(tmp_path)
+    (tmp_path / "cache" / f"{key}.json").write_text('{"pages": [')
+    assert cache.load(key, pdf) is None
+
+    cache, pdf, key, _, _ = make_entry(tmp_path)
+    (tmp_path / "cache" / f"{key}.bin").write_bytes(b"Paneer")
+    assert cache.load(key, pdf) is None
+
+
+def test_file_hash_is_reused_until_size_or_mtime_changes(tmp_path):
+    pdf = tmp_path / "recipes.pdf"
+    pdf.write_bytes(b"%PDF- paneer")
+    first = DocumentCache.file_hash(pdf)
+    stat = pdf.stat()
+
+    # Same size and mtime: served from memory without reading the file
+    pdf.write_bytes(b"%PDF- chhena")
+    os.utime(pdf, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert DocumentCache.file_hash(pdf) == first
+
+    os.utime(pdf, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert DocumentCache.file_hash(pdf) != first
@@ -0,0 +1,40 @@
+import time
+import httpx
+import groq
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_groq import ChatGroq
+from src.RasoiGuru.components.budget import LatencyBudget
+from src.RasoiGuru.components.generation import BudgetedChatGroq
+
+
+def make_llm(monkeypatch, failures):
+    timeouts = []
+
+    def generate(self, messages, stop=None, run_manager=None, **kwargs):
+        timeouts.append(kwargs["timeout"])
+        if len(timeouts) <= failures:
+            time.sleep(kwargs["timeout"])
+            raise groq.APITimeoutError(request=httpx.Request("POST", "https://api.groq.com"))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="Final Answer: dal"))])
+
+    monkeypatch.setattr(ChatGroq, "_generate", generate)
+    budget = LatencyBudget(budget_seconds=1, llm_max_retries=1)
+    llm = BudgetedChatGroq(model="mixtral-8x7b-32768", api_key="test", budget=budget, max_retries=0)
+    return llm, timeouts
+
+
+def test_attempts_share_the_remaining_time(monkeypatch):
+    llm, timeouts = make_llm(monkeypatch, failures=1)
+    assert llm.invoke([HumanMessage(content="dal?")]).content == "Final Answer: dal"
+    assert len(timeouts) == 2
+    assert 0.3 < timeouts[0] <= 0.5
+    assert sum(timeouts) <= 1
+
+
+def test_last_failure_is_raised(monkeypatch):
+    llm, timeouts = make_llm(monkeypatch, failures=2)
+    with pytest.raises(groq.APITimeoutError):
+        llm.invoke([HumanMessage(content="dal?")])
+    assert len(timeouts) == 2
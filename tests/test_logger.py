@@ -0,0 +1,17 @@
+import logging
+from src.logger import SamplingFilter
+
+
+def make_record(module: str, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord("root", level, f"/src/{module}.py", 1, "message", None, None)
+
+
+def test_sampling_only_applies_to_listed_modules():
+    sampling = SamplingFilter({"create_tools": 0.0})
+    assert not sampling.filter(make_record("create_tools"))
+    assert sampling.filter(make_record("namespace_router"))
+
+
+def test_sampling_keeps_records_above_the_sampled_level():
+    sampling = SamplingFilter({"create_tools": 0.0})
+    assert sampling.filter(make_record("create_tools", logging.WARNING))
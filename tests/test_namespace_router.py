@@ -0,0 +1,56 @@
+import pytest
+from src.exception import CustomException
+from src.RasoiGuru.components.create_tools import ToolCreator
+from src.RasoiGuru.components.namespace_router import NamespaceRouter
+from src.RasoiGuru.components.retrieval_eval import HashingEmbeddings, LocalVectorStore
+
+CONTENTS = [
+    ["Paneer is fresh cheese made by curdling milk.", "Paneer tikka is grilled paneer with spices."],
+    ["Basmati rice is soaked before cooking biryani.", "Biryani layers rice with marinated meat."],
+]
+
+
+def make_router(tmp_path):
+    router = NamespaceRouter(HashingEmbeddings(), index_path=tmp_path / "router.npz", top_n=1, min_score=0.0)
+    router.build(["nsdairy", "nsrice"], CONTENTS, ["hash-dairy", "hash-rice"])
+    return router
+
+
+def test_index_round_trip_keeps_file_hashes(tmp_path):
+    make_router(tmp_path)
+    router = NamespaceRouter(HashingEmbeddings(), index_path=tmp_path / "router.npz")
+    assert router.load()
+    assert router.is_current(["nsdairy", "nsrice"], ["hash-dairy", "hash-rice"])
+    assert not router.is_current(["nsdairy", "nsrice"], ["hash-dairy", "hash-rice-v2"])
+    assert not router.is_current(["nsrice", "nsdairy"], ["hash-rice", "hash-dairy"])
+
+
+def test_damaged_index_is_stale(tmp_path):
+    index_path = tmp_path / "router.npz"
+    make_router(tmp_path)
+    index_path.write_bytes(index_path.read_bytes()[:100])
+
+    router = NamespaceRouter(HashingEmbeddings(), index_path=index_path)
+    assert not router.load()
+    assert not router.is_current(["nsdairy", "nsrice"], ["hash-dairy", "hash-rice"])
+    router.build(["nsdairy", "nsrice"], CONTENTS, ["hash-dairy", "hash-rice"])
+    assert NamespaceRouter(HashingEmbeddings(), index_path=index_path).load()
+    assert [path.name for path in tmp_path.iterdir()] == ["router.npz"]
+
+
+@pytest.mark.parametrize("search_type", ["similarity", "mmr"])
+def test_routed_retriever_searches_routed_namespace(tmp_path, search_type):
+    router = make_router(tmp_path)
+    vectorstores = [LocalVectorStore.from_texts(content, HashingEmbeddings()) for content in CONTENTS]
+    retriever = ToolCreator().create_routed_retriever(
+        vectorstores, ["nsdairy", "nsrice"], router, search_type=search_type, search_kwargs={"k": 2}
+    )[0]
+    docs = retriever.invoke("how is biryani rice cooked")
+    assert len(docs) == 2
+    assert all("rice" in doc.page_content.lower() for doc in docs)
+
+
+def test_unsupported_search_type_is_rejected(tmp_path):
+    router = make_router(tmp_path)
+    with pytest.raises(CustomException):
+        ToolCreator().create_routed_retriever([], [], router, search_type="similarity_score_threshold")
@@ -0,0 +1,70 @@
+import threading
+from langchain.agents import Tool
+from langchain.chains.conversation.memory import ConversationBufferWindowMemory
+from src import metrics
+from src.RasoiGuru.components.budget import LatencyBudget
+from src.RasoiGuru.components.create_tools import ToolCreator
+from src.RasoiGuru.components.prefetch import Prefetcher
+from src.RasoiGuru.pipeline.pipeline import create_pipeline
+
+
+def make_tool(name, func):
+    return Tool(name=name, description=f"Searches {name}", func=func)
+
+
+def count(name):
+    return metrics.snapshot().get(name, 0)
+
+
+def test_late_call_is_counted_and_left_out():
+    release = threading.Event()
+    tools = [make_tool("pdf", lambda q: "Paneer is fresh cheese."),
+             make_tool("wiki", lambda q: release.wait(5) and "late")]
+    late = count("prefetch_late_total")
+    try:
+        context = Prefetcher(wait_seconds=0.2).fetch("what is paneer", tools)
+    finally:
+        release.set()
+    assert "Paneer is fresh cheese." in context
+    assert "wiki" not in context
+    assert count("prefetch_late_total") == late + 1
+
+
+def test_repeated_call_is_served_from_prefetch_without_using_the_budget():
+    calls = []
+    tools = [make_tool("pdf", lambda q: calls.append(q) or "Paneer is fresh cheese.")]
+    budget = LatencyBudget(budget_seconds=10, max_tool_calls=1)
+    prefetcher = Prefetcher(wait_seconds=1, budget=budget)
+    prefetcher.fetch("What is paneer", tools)
+
+    hits = count("prefetch_cache_hits_total")
+    agent_tools = prefetcher.wrap_tools(ToolCreator().apply_budget(tools, budget))
+    assert agent_tools[0].func(" what is  PANEER ") == "Paneer is fresh cheese."
+    assert count("prefetch_cache_hits_total") == hits + 1
+    assert budget.tool_calls == 0
+    assert calls == ["What is paneer"]
+
+
+def test_failed_call_is_counted_as_error():
+    def fail(query):
+        raise RuntimeError("index unavailable")
+
+    errors = count("prefetch_errors_total")
+    context = Prefetcher(wait_seconds=1).fetch("what is paneer", [make_tool("pdf", fail)])
+    assert context == ""
+    assert count("prefetch_errors_total") == errors + 1
+
+
+def test_follow_up_question_skips_prefetch(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+
+    def fetch(self, query, tools):
+        raise AssertionError("follow-up question was prefetched")
+
+    monkeypatch.setattr(Prefetcher, "fetch", fetch)
+    memory = ConversationBufferWindowMemory(k=3, return_messages=True, memory_key="chat_history")
+    memory.save_context({"input": "What is paneer?"}, {"output": "Paneer is fresh cheese."})
+
+    skipped = count("prefetch_skipped_followups_total")
+    create_pipeline([], memory, LatencyBudget(), query="what about its history?", prefetch_wait=1)
+    assert count("prefetch_skipped_followups_total") == skipped + 1
@@ -0,0 +1,35 @@
+from langchain_core.documents import Document
+from src.RasoiGuru.components.retrieval_eval import HashingEmbeddings, RetrievalEvaluator
+
+PHRASE = "introduced in India by the Portuguese"
+
+
+def make_evaluator():
+    page = Document(
+        page_content="Chilli is a spice that was introduced in India by the Portuguese traders. It is now grown widely.",
+        metadata={"source": "spices.pdf", "page": 0}
+    )
+    evaluator = RetrievalEvaluator([], [{"question": "Who brought chilli to India?", "evidence": [PHRASE]}],
+                                   HashingEmbeddings())
+    evaluator.pages = [[page]]
+    return evaluator
+
+
+def test_phrase_split_across_adjacent_chunks_is_found():
+    evaluator = make_evaluator()
+    index = evaluator.build_index(chunk_size=40, chunk_overlap=10)
+    occurrence = evaluator._evidence(PHRASE)[0]
+    spans = [span for span in index["spans"] if span[1] < occurrence[2] and span[2] > occurrence[1]]
+
+    assert len(spans) == 2
+    assert not any(PHRASE in doc.page_content for doc in index["vectorstore"].documents)
+    assert evaluator._covered(occurrence, spans)
+    assert not evaluator._covered(occurrence, spans[:1])
+    assert not evaluator._covered(occurrence, spans[1:])
+
+
+def test_phrase_inside_one_chunk_is_found():
+    evaluator = make_evaluator()
+    index = evaluator.build_index(chunk_size=1000, chunk_overlap=0)
+    assert index["num_chunks"] == 1
+    assert evaluator.evaluate(1000, 0, 1, "similarity")["recall_at_k"] == 1.0